@@ -29,6 +29,10 @@ class Config:
     DEVICE_LOCATIONS_COLLECTION = 'device_locations'
     ZONES_COLLECTION = 'monitoring_zones'
     
+    # Vision Model Input
+    MODEL_INPUT_WIDTH = 640   # Frames are downscaled to this before detection
+    MODEL_INPUT_HEIGHT = 480
+    
     # Grid Configuration
     GRID_SIZE_METERS = 50  # Size of each monitoring grid in meters
     PREDICTION_WINDOW_MINUTES = 20  # How far ahead to predict
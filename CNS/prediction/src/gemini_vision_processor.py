@@ -117,6 +117,101 @@ Respond in JSON format with these exact keys:
             self.logger.error(f"Error calling Gemini API: {e}")
             return self._fallback_detection(frame)
     
+    def detect_people_with_gemini_batch(self, frames: List[np.ndarray]) -> List[Dict]:
+        """
+        Analyze several frames with a single Gemini request.
+
+        One request carrying N images amortizes the per-call HTTP and model
+        overhead across the batch instead of paying it once per frame.
+
+        Args:
+            frames: List of video frames as numpy arrays
+
+        Returns:
+            List of crowd analysis dicts, one per frame (in order)
+        """
+        if not frames:
+            return []
+        if len(frames) == 1:
+            return [self.detect_people_with_gemini(frames[0])]
+
+        try:
+            parts = [{
+                "text": f"""Analyze these {len(frames)} crowd images for crowd management.
+For EACH image, in order, provide:
+1. Total number of people visible
+2. Crowd density level (low/medium/high/critical)
+3. Movement patterns (stationary/slow/moderate/fast)
+4. Any bottleneck areas or congestion points
+5. Safety concerns if any
+
+Respond in JSON format with exactly this structure:
+{{
+  "analyses": [
+    {{
+      "person_count": number,
+      "density_level": "low/medium/high/critical",
+      "movement_speed": "stationary/slow/moderate/fast",
+      "bottleneck_areas": ["description of areas"],
+      "safety_concerns": ["list of concerns"],
+      "crowd_distribution": "description of how people are distributed"
+    }}
+  ]
+}}
+The "analyses" array must contain one object per image, in the same order as the images."""
+            }]
+            for frame in frames:
+                parts.append({
+                    "inline_data": {
+                        "mime_type": "image/jpeg",
+                        "data": self.encode_image_to_base64(frame)
+                    }
+                })
+
+            payload = {"contents": [{"parts": parts}]}
+
+            response = requests.post(
+                self.gemini_url,
+                headers={'Content-Type': 'application/json'},
+                json=payload,
+                timeout=60
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+
+                if 'candidates' in result and len(result['candidates']) > 0:
+                    text_response = result['candidates'][0]['content']['parts'][0]['text']
+
+                    clean_response = text_response.strip()
+                    if clean_response.startswith('```json'):
+                        clean_response = clean_response.replace('```json', '').replace('```', '').strip()
+
+                    analyses = json.loads(clean_response).get('analyses', [])
+
+                    now_iso = datetime.utcnow().isoformat()
+                    results = []
+                    for frame, analysis in zip(frames, analyses):
+                        analysis['timestamp'] = now_iso
+                        analysis['frame_dimensions'] = frame.shape[:2]
+                        analysis['analysis_method'] = 'gemini_vision_batch'
+                        results.append(analysis)
+
+                    # Pad with fallbacks if Gemini returned fewer analyses
+                    while len(results) < len(frames):
+                        results.append(self._fallback_detection(frames[len(results)]))
+
+                    return results
+
+            else:
+                self.logger.error(f"Gemini API error: {response.status_code} - {response.text}")
+
+        except Exception as e:
+            self.logger.error(f"Error in batched Gemini analysis: {e}")
+
+        # Fall back to per-frame analysis
+        return [self.detect_people_with_gemini(frame) for frame in frames]
+
     def _parse_text_response(self, text: str, frame_shape: Tuple[int, int]) -> Dict:
         """Parse text response when JSON parsing fails."""
         # Basic text parsing for crowd analysis
@@ -1,7 +1,10 @@
 """Vertex AI Vision processing for crowd analysis."""
 
+import base64
 import cv2
 import numpy as np
+import queue
+import threading
 from typing import Dict, List, Tuple
 from google.cloud import aiplatform
 from google.cloud import pubsub_v1
@@ -9,6 +12,53 @@ import json
 import logging
 from datetime import datetime
 
+# Hungarian assignment for frame-to-frame matching; optional so the
+# module still imports without SciPy (falls back to nearest-neighbor)
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+# C-accelerated JSON with native numpy support for the per-frame publish
+# path; stdlib fallback keeps the module importable without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _pairwise_min_dist(curr, prev):
+    """Index of the nearest previous center for each current center.
+
+    Fused subtract/square/compare loop: at per-frame detection counts
+    (tens of points) this beats broadcasting, which pays dispatch overhead
+    and materializes an (N, M, 2) temporary.
+    """
+    out_idx = np.empty(curr.shape[0], np.int64)
+    for i in range(curr.shape[0]):
+        best = np.inf
+        best_j = 0
+        for j in range(prev.shape[0]):
+            dx = curr[i, 0] - prev[j, 0]
+            dy = curr[i, 1] - prev[j, 1]
+            d = dx * dx + dy * dy
+            if d < best:
+                best = d
+                best_j = j
+        out_idx[i] = best_j
+    return out_idx
+
+
+# JIT-compile the matching kernel when numba is installed; without it the
+# broadcasted numpy path below is used instead of the Python loop
+_HAVE_NUMBA = False
+try:
+    from numba import njit as _njit
+    _pairwise_min_dist = _njit(cache=True, fastmath=True)(_pairwise_min_dist)
+    _HAVE_NUMBA = True
+except ImportError:
+    pass
+
 from .config import Config
 
 class CrowdVisionProcessor:
@@ -16,7 +66,15 @@ class CrowdVisionProcessor:
     
     def __init__(self):
         self.config = Config()
-        self.publisher = pubsub_v1.PublisherClient()
+        # Let the client-side batcher coalesce publishes (up to 100
+        # messages / 1 MB / 100 ms) instead of one RPC per message
+        self.publisher = pubsub_v1.PublisherClient(
+            batch_settings=pubsub_v1.types.BatchSettings(
+                max_messages=100,
+                max_bytes=1024 * 1024,
+                max_latency=0.1
+            )
+        )
         self.topic_path = self.publisher.topic_path(
             self.config.PROJECT_ID, 
             self.config.VIDEO_STREAM_TOPIC
@@ -31,7 +89,7 @@ class CrowdVisionProcessor:
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
-    def detect_people_in_frame(self, frame: np.ndarray) -> List[Dict]:
+    def detect_people_in_frame(self, frame: np.ndarray) -> Dict:
         """
         Detect people in a video frame using Vertex AI Vision.
         
@@ -39,7 +97,8 @@ class CrowdVisionProcessor:
             frame: Video frame as numpy array
             
         Returns:
-            List of detected person objects with bounding boxes
+            Detections in SoA layout: 'bboxes' (N, 4) float32 array of
+            x1, y1, x2, y2, 'confidence' (N,) float32 array, 'classes' list
         """
         # Convert frame to format suitable for Vertex AI
         # This would typically involve calling a deployed model endpoint
@@ -50,52 +109,97 @@ class CrowdVisionProcessor:
         
         return detections
     
-    def _mock_person_detection(self, frame: np.ndarray) -> List[Dict]:
+    # Frames per detection request; one batched predict amortizes the
+    # per-RPC and model-launch overhead across the batch
+    DETECTION_BATCH_SIZE = 8
+
+    # Keep 1 frame in FRAME_STRIDE: crowd dynamics evolve at ~1 Hz, so
+    # detecting all 30 FPS buys nothing but CPU and API cost
+    FRAME_STRIDE = 15
+
+    def detect_people_in_batch(self, frames: List[np.ndarray]) -> List[Dict]:
+        """
+        Detect people in several frames with one batched request.
+        
+        A Vertex AI endpoint accepts a list of instances, so B frames cost
+        one RPC instead of B; on-device a batched inference likewise
+        amortizes kernel-launch overhead.
+        
+        Args:
+            frames: List of video frames as numpy arrays
+            
+        Returns:
+            List of SoA detection dicts, one per frame (in order)
+        """
+        # Placeholder for a single batched Vertex AI predict call over
+        # _frames_to_instances(frames); mocked per frame until the endpoint
+        # is wired up
+        return [self._mock_person_detection(frame) for frame in frames]
+
+    # JPEG quality for frames shipped to the detector endpoint; 85 keeps
+    # detection-relevant detail at a fraction of the raw tensor size
+    JPEG_QUALITY = 85
+
+    def _frames_to_instances(self, frames: List[np.ndarray]) -> List[Dict]:
+        """JPEG-encode frames into Vertex AI predict instances.
+        
+        A raw 1080p float tensor is ~25 MB on the wire; an 85-quality JPEG
+        of the same frame is ~200 KB, so encoding client-side and letting
+        the model decode server-side cuts the RPC payload ~100x.
+        """
+        instances = []
+        encode_params = [cv2.IMWRITE_JPEG_QUALITY, self.JPEG_QUALITY]
+        for frame in frames:
+            ok, buf = cv2.imencode('.jpg', frame, encode_params)
+            if not ok:
+                raise ValueError("Failed to JPEG-encode frame for detection")
+            instances.append({'b64': base64.b64encode(buf.tobytes()).decode('ascii')})
+        return instances
+    
+    def _mock_person_detection(self, frame: np.ndarray) -> Dict:
         """Mock person detection for demonstration."""
-        # This would be replaced with actual Vertex AI Vision calls
+        # This would be replaced with actual Vertex AI Vision calls.
+        # SoA layout (arrays per field rather than a dict per detection)
+        # lets downstream metrics compute centers with broadcasted ops.
         height, width = frame.shape[:2]
         
         # Simulate some detections
-        mock_detections = [
-            {
-                'bbox': [100, 100, 150, 200],  # x1, y1, x2, y2
-                'confidence': 0.85,
-                'class': 'person'
-            },
-            {
-                'bbox': [200, 120, 250, 220],
-                'confidence': 0.92,
-                'class': 'person'
-            }
-        ]
-        
-        return mock_detections
+        return {
+            'bboxes': np.array([
+                [100, 100, 150, 200],  # x1, y1, x2, y2
+                [200, 120, 250, 220]
+            ], dtype=np.float32),
+            'confidence': np.array([0.85, 0.92], dtype=np.float32),
+            'classes': ['person', 'person']
+        }
     
-    def calculate_crowd_metrics(self, detections: List[Dict], 
-                              frame_shape: Tuple[int, int]) -> Dict:
+    def calculate_crowd_metrics(self, detections: Dict, 
+                              frame_shape: Tuple[int, int],
+                              scale: Tuple[float, float] = None) -> Dict:
         """
         Calculate crowd density and flow metrics from detections.
         
         Args:
-            detections: List of person detections
+            detections: SoA detections ('bboxes' (N, 4), 'confidence' (N,))
             frame_shape: (height, width) of the frame
+            scale: Optional (x, y) factors mapping detection coordinates
+                   back to frame_shape when detection ran on a resized frame
             
         Returns:
             Dictionary with crowd metrics
         """
-        person_count = len(detections)
+        bboxes = detections['bboxes']
+        person_count = len(bboxes)
         frame_area = frame_shape[0] * frame_shape[1]
         
         # Calculate density (people per unit area)
         density = person_count / (frame_area / 10000)  # normalize to reasonable scale
         
-        # Calculate center points for flow analysis
-        centers = []
-        for detection in detections:
-            bbox = detection['bbox']
-            center_x = (bbox[0] + bbox[2]) / 2
-            center_y = (bbox[1] + bbox[3]) / 2
-            centers.append((center_x, center_y))
+        # Center points for flow analysis, computed in one broadcasted op;
+        # kept float32 so analyze_crowd_flow takes the array zero-copy
+        centers = (bboxes[:, [0, 1]] + bboxes[:, [2, 3]]) * 0.5
+        if scale is not None:
+            centers *= np.asarray(scale, dtype=np.float32)
         
         metrics = {
             'timestamp': datetime.utcnow().isoformat(),
@@ -111,45 +215,170 @@ class CrowdVisionProcessor:
         """
         Process a video stream and publish crowd metrics.
         
+        Decode, detection, and metrics/publish run as a three-stage
+        pipeline over bounded queues, so the CPU keeps decoding while the
+        detector round-trip is in flight; throughput approaches the
+        slowest stage instead of the sum of all three. Stages shut down
+        via a None sentinel.
+        
         Args:
             video_source: Path or URL to video source
             zone_id: Identifier for the monitoring zone
         """
-        cap = cv2.VideoCapture(video_source)
+        # Ask for the FFmpeg backend with hardware-accelerated decode; on
+        # hosts with NVDEC/VA-API/QuickSync this moves the dominant
+        # decode cost off the CPU (no-op where unsupported). The property
+        # must go in the open params — it's only honored at open time,
+        # cap.set() after opening is silently ignored.
+        cap = cv2.VideoCapture(
+            video_source, cv2.CAP_FFMPEG,
+            [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        )
+        
+        model_size = (self.config.MODEL_INPUT_WIDTH, self.config.MODEL_INPUT_HEIGHT)
+        
+        # Bounded hand-off queues: small enough to cap memory, deep enough
+        # to keep every stage busy
+        decode_queue = queue.Queue(maxsize=4)
+        publish_queue = queue.Queue(maxsize=4)
+        
+        def _decode_stage():
+            try:
+                frames = []
+                orig_shape = None
+                frame_index = 0
+                while True:
+                    # grab() advances the stream without the decode cost;
+                    # only kept frames pay retrieve()'s full decode
+                    frame_index += 1
+                    if frame_index % self.FRAME_STRIDE != 0:
+                        if not cap.grab():
+                            break
+                        continue
+                    
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    
+                    orig_shape = frame.shape[:2]
+                    
+                    # Downscale to the model's input resolution before detection:
+                    # detectors downscale internally anyway, so sending the full
+                    # frame just wastes bandwidth and memcpy. INTER_AREA for
+                    # clean decimation; contiguous for zero-copy serialization.
+                    if orig_shape != (model_size[1], model_size[0]):
+                        frame = np.ascontiguousarray(
+                            cv2.resize(frame, model_size, interpolation=cv2.INTER_AREA)
+                        )
+                    
+                    # Accumulate a batch so the detector round-trip is paid
+                    # once per DETECTION_BATCH_SIZE frames, not once per frame
+                    frames.append(frame)
+                    if len(frames) < self.DETECTION_BATCH_SIZE:
+                        continue
+                    
+                    decode_queue.put((frames, orig_shape))
+                    frames = []
+                
+                # Flush the partial batch left at end of stream
+                if frames:
+                    decode_queue.put((frames, orig_shape))
+            except Exception as e:
+                self.logger.error(f"Error decoding video stream: {e}")
+            finally:
+                decode_queue.put(None)
+        
+        def _detect_stage():
+            try:
+                while True:
+                    item = decode_queue.get()
+                    if item is None:
+                        break
+                    frames, orig_shape = item
+                    detections_batch = self.detect_people_in_batch(frames)
+                    publish_queue.put((frames, detections_batch, orig_shape))
+            except Exception as e:
+                self.logger.error(f"Error detecting people: {e}")
+            finally:
+                publish_queue.put(None)
         
+        decoder = threading.Thread(target=_decode_stage, daemon=True)
+        detector = threading.Thread(target=_detect_stage, daemon=True)
+        decoder.start()
+        detector.start()
+        
+        # Metrics + publish run on the calling thread as the final stage
         try:
             while True:
-                ret, frame = cap.read()
-                if not ret:
+                item = publish_queue.get()
+                if item is None:
                     break
-                
-                # Detect people in frame
-                detections = self.detect_people_in_frame(frame)
-                
-                # Calculate crowd metrics
-                metrics = self.calculate_crowd_metrics(detections, frame.shape[:2])
-                metrics['zone_id'] = zone_id
-                
-                # Publish to Pub/Sub
-                self._publish_metrics(metrics)
-                
-                self.logger.info(f"Processed frame for zone {zone_id}: "
-                               f"{metrics['person_count']} people detected")
-                
+                frames, detections_batch, orig_shape = item
+                self._emit_batch_metrics(frames, detections_batch, zone_id, orig_shape)
         except Exception as e:
             self.logger.error(f"Error processing video stream: {e}")
         finally:
+            decoder.join(timeout=5)
+            detector.join(timeout=5)
             cap.release()
     
+    def _process_frame_batch(self, frames: List[np.ndarray], zone_id: str,
+                             orig_shape: Tuple[int, int] = None):
+        """Detect, compute metrics, and publish for one batch of frames."""
+        detections_batch = self.detect_people_in_batch(frames)
+        self._emit_batch_metrics(frames, detections_batch, zone_id, orig_shape)
+
+    def _emit_batch_metrics(self, frames: List[np.ndarray], detections_batch: List[Dict],
+                            zone_id: str, orig_shape: Tuple[int, int] = None):
+        """Compute and publish metrics for one detected batch.
+        
+        orig_shape: pre-resize (height, width); metrics keep the original
+        frame's density units, with centers scaled back up to match.
+        """
+        for frame, detections in zip(frames, detections_batch):
+            model_shape = frame.shape[:2]
+            if orig_shape is None or orig_shape == model_shape:
+                metrics_shape, scale = model_shape, None
+            else:
+                metrics_shape = orig_shape
+                scale = (orig_shape[1] / model_shape[1], orig_shape[0] / model_shape[0])
+            
+            # Calculate crowd metrics
+            metrics = self.calculate_crowd_metrics(detections, metrics_shape, scale)
+            metrics['zone_id'] = zone_id
+            
+            # Publish to Pub/Sub
+            self._publish_metrics(metrics)
+            
+            self.logger.info(f"Processed frame for zone {zone_id}: "
+                           f"{metrics['person_count']} people detected")
+
     def _publish_metrics(self, metrics: Dict):
         """Publish crowd metrics to Pub/Sub."""
         try:
-            message_data = json.dumps(metrics).encode('utf-8')
+            if orjson is not None:
+                # Serializes numpy arrays natively and emits bytes directly
+                message_data = orjson.dumps(metrics, option=orjson.OPT_SERIALIZE_NUMPY)
+            else:
+                message_data = json.dumps(
+                    metrics,
+                    default=lambda o: o.tolist() if isinstance(o, np.ndarray) else str(o)
+                ).encode('utf-8')
+            # Fire-and-forget: blocking on result() here stalled the frame
+            # loop on a publish RTT per message; the background batcher
+            # flushes and the callback surfaces any failure
             future = self.publisher.publish(self.topic_path, message_data)
-            future.result()  # Wait for publish to complete
+            future.add_done_callback(self._on_publish_done)
             
         except Exception as e:
             self.logger.error(f"Failed to publish metrics: {e}")
+
+    def _on_publish_done(self, future):
+        """Log publish failures without blocking the processing loop."""
+        try:
+            future.result()
+        except Exception as e:
+            self.logger.error(f"Failed to publish metrics: {e}")
     
     def analyze_crowd_flow(self, current_centers: List[Tuple], 
                           previous_centers: List[Tuple]) -> Dict:
@@ -163,44 +392,50 @@ class CrowdVisionProcessor:
         Returns:
             Flow analysis results
         """
-        if not previous_centers or not current_centers:
+        if len(previous_centers) == 0 or len(current_centers) == 0:
             return {'flow_vectors': [], 'average_velocity': 0}
         
         # Simple flow calculation (in practice, use more sophisticated tracking)
-        flow_vectors = []
+        # One broadcasted distance matrix + argmin replaces the per-point
+        # min() scan that allocated two arrays per candidate comparison
+        curr = np.asarray(current_centers, dtype=np.float32)
+        prev = np.asarray(previous_centers, dtype=np.float32)
         
-        # Match closest points between frames (simplified)
-        for curr_point in current_centers:
-            if previous_centers:
-                closest_prev = min(previous_centers, 
-                                 key=lambda p: np.linalg.norm(np.array(curr_point) - np.array(p)))
-                
-                flow_vector = (
-                    curr_point[0] - closest_prev[0],
-                    curr_point[1] - closest_prev[1]
-                )
-                flow_vectors.append(flow_vector)
-        
-        # Calculate average velocity
-        if flow_vectors:
-            avg_velocity = np.mean([np.linalg.norm(v) for v in flow_vectors])
+        # Hungarian assignment gives a one-to-one matching, so dense crowds
+        # don't map several current points onto the same previous point and
+        # produce bogus flow vectors. Fall back to plain nearest-neighbor
+        # when SciPy is absent or the detection counts diverge too far for
+        # a meaningful assignment.
+        n_curr, n_prev = curr.shape[0], prev.shape[0]
+        if (linear_sum_assignment is not None
+                and min(n_curr, n_prev) * 2 >= max(n_curr, n_prev)):
+            diff = curr[:, None, :] - prev[None, :, :]
+            row, col = linear_sum_assignment(np.sqrt((diff * diff).sum(-1)))
+            flow = curr[row] - prev[col]
+        elif _HAVE_NUMBA:
+            # Fused JIT kernel: no (N, M, 2) broadcast temporary
+            flow = curr - prev[_pairwise_min_dist(curr, prev)]
         else:
-            avg_velocity = 0
+            diff = curr[:, None, :] - prev[None, :, :]
+            idx = (diff * diff).sum(-1).argmin(axis=1)
+            flow = curr - prev[idx]
+        mags = np.sqrt((flow * flow).sum(-1))
+        avg_velocity = mags.mean() if flow.shape[0] else 0.0
         
         return {
-            'flow_vectors': flow_vectors,
+            'flow_vectors': [tuple(v) for v in flow.tolist()],
             'average_velocity': float(avg_velocity),
-            'flow_direction': self._calculate_dominant_direction(flow_vectors)
+            'flow_direction': self._calculate_dominant_direction(flow)
         }
     
-    def _calculate_dominant_direction(self, flow_vectors: List[Tuple]) -> str:
-        """Calculate the dominant flow direction."""
-        if not flow_vectors:
+    def _calculate_dominant_direction(self, flow_vectors) -> str:
+        """Calculate the dominant flow direction from an (N, 2) flow array."""
+        flow = np.asarray(flow_vectors, dtype=np.float32)
+        if flow.size == 0:
             return 'stationary'
         
         # Calculate average flow direction
-        avg_x = np.mean([v[0] for v in flow_vectors])
-        avg_y = np.mean([v[1] for v in flow_vectors])
+        avg_x, avg_y = flow.mean(axis=0)
         
         # Determine dominant direction
         if abs(avg_x) > abs(avg_y):
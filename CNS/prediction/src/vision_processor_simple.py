@@ -2,22 +2,117 @@
 
 import numpy as np
 import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
 from typing import Dict, List, Tuple
 import json
 import logging
 from datetime import datetime
 
+
+def _iso(ns: int) -> str:
+    """Format an integer nanosecond timestamp as ISO-8601 (UTC).
+
+    Called only at serialization boundaries; the per-frame metrics path
+    stores the raw integer.
+    """
+    return datetime.utcfromtimestamp(ns / 1e9).isoformat()
+
+
+def _crowd_kernel(bboxes, height, width, out):
+    """Fused centers + density computation over an (N, 4) bbox array.
+
+    One loop writing both center coordinates into the caller's output
+    buffer, compiled to native code by numba when available; no Python
+    objects are touched inside.
+    """
+    n = bboxes.shape[0]
+    for i in range(n):
+        out[i, 0] = (bboxes[i, 0] + bboxes[i, 2]) * 0.5
+        out[i, 1] = (bboxes[i, 1] + bboxes[i, 3]) * 0.5
+    return n / (height * width / 10000.0)
+
+
+# Deterministic mock detections, built once at import. The arrays are
+# marked read-only: consumers get the shared instance and must copy
+# before mutating.
+_MOCK_BBOXES = np.array([
+    [100, 100, 150, 200],  # x1, y1, x2, y2
+    [200, 120, 250, 220]
+], dtype=np.float32)
+_MOCK_SCORES = np.array([0.85, 0.92], dtype=np.float32)
+_MOCK_CLASSES = np.array(['person', 'person'])
+for _arr in (_MOCK_BBOXES, _MOCK_SCORES, _MOCK_CLASSES):
+    _arr.setflags(write=False)
+
+
+# Compile the metrics kernel to native code when numba is installed; the
+# vectorized numpy path below remains the fallback. nogil lets the
+# stream_process pipeline stages overlap this loop across threads, since
+# the compiled kernel touches no Python objects.
+_HAVE_NUMBA = False
+try:
+    from numba import njit as _njit
+    _crowd_kernel = _njit(cache=True, fastmath=True, nogil=True,
+                          boundscheck=False)(_crowd_kernel)
+    _HAVE_NUMBA = True
+except ImportError:
+    pass
+
+
+@dataclass
+class Detections:
+    """Detection results in SoA layout: one contiguous array per field."""
+
+    bboxes: np.ndarray   # (N, 4) float32, x1/y1/x2/y2
+    scores: np.ndarray   # (N,) float32
+    classes: np.ndarray  # (N,) object/str
+
+    def __len__(self) -> int:
+        return len(self.bboxes)
+
+
 class CrowdVisionProcessor:
     """Processes video streams for crowd analysis."""
     
-    def __init__(self):
+    # Lazily-built shared test frame: ~900 KB of zeroed pages that health
+    # checks would otherwise reallocate and memset on every call
+    _TEST_FRAME = None
+    
+    def __init__(self, batch_size: int = 8, frame_skip: int = 1,
+                 target_latency: float = None):
         # Get project ID from environment variable
         self.project_id = os.getenv('GCP_PROJECT_ID', 'your-actual-project-id')
         
-        logging.basicConfig(level=logging.INFO)
+        # Frames per detection request; a real detector amortizes its
+        # per-call and model-launch overhead across the batch
+        self.batch_size = batch_size
+        
+        # Density normalization per frame shape: for a fixed camera the
+        # constant is invariant, so the hot path pays one multiply instead
+        # of two divisions
+        self._density_scale = {}
+        
+        # Stream-mode subsampling: process every frame_skip-th frame. With
+        # target_latency set (seconds per frame), stream_process adapts the
+        # skip to hold that budget — crowd dynamics evolve at ~1 Hz, so
+        # dropped frames cost little fidelity. Flow analysis needs enough
+        # temporal sampling; keep the budget generous if flow matters.
+        self.frame_skip = max(frame_skip, 1)
+        self.target_latency = target_latency
+        
+        # Reusable per-instance scratch buffers for the metrics hot path;
+        # grown by doubling when a frame exceeds capacity. Not shared
+        # between threads — use one processor per pipeline thread.
+        self._bbox_cap = 256
+        self._bbox_scratch = np.empty((self._bbox_cap, 4), dtype=np.float32)
+        self._centers_scratch = np.empty((self._bbox_cap, 2), dtype=np.float32)
+        
         self.logger = logging.getLogger(__name__)
     
-    def detect_people_in_frame(self, frame: np.ndarray) -> List[Dict]:
+    def detect_people_in_frame(self, frame: np.ndarray) -> Detections:
         """
         Detect people in a video frame.
         
@@ -25,74 +120,207 @@ class CrowdVisionProcessor:
             frame: Video frame as numpy array
             
         Returns:
-            List of detected person objects with bounding boxes
+            Detections with bboxes (N, 4), scores (N,), classes (N,) arrays
         """
         # Mock detection for demonstration
         detections = self._mock_person_detection(frame)
         return detections
     
-    def _mock_person_detection(self, frame: np.ndarray) -> List[Dict]:
-        """Mock person detection for demonstration."""
-        height, width = frame.shape[:2]
-        
-        # Simulate some detections
-        mock_detections = [
-            {
-                'bbox': [100, 100, 150, 200],  # x1, y1, x2, y2
-                'confidence': 0.85,
-                'class': 'person'
-            },
-            {
-                'bbox': [200, 120, 250, 220],
-                'confidence': 0.92,
-                'class': 'person'
-            }
-        ]
-        
-        return mock_detections
+    def detect_people_in_batch(self, frames: np.ndarray) -> List[Detections]:
+        """
+        Detect people in a stack of frames with one call.
+        
+        Args:
+            frames: (B, H, W, 3) uint8 frame stack
+            
+        Returns:
+            One Detections record per frame, in order
+        """
+        # In production this is a single batched endpoint request over the
+        # whole stack; the mock just iterates
+        return [self._mock_person_detection(frames[i]) for i in range(frames.shape[0])]
+    
+    # Shared immutable record returned by the mock; the deterministic
+    # arrays live at module scope so nothing is allocated per frame
+    _MOCK_DETECTIONS = Detections(
+        bboxes=_MOCK_BBOXES,
+        scores=_MOCK_SCORES,
+        classes=_MOCK_CLASSES
+    )
+
+    def _mock_person_detection(self, frame: np.ndarray) -> Detections:
+        """Mock person detection for demonstration (shared, do not mutate)."""
+        return self._MOCK_DETECTIONS
     
-    def calculate_crowd_metrics(self, detections: List[Dict], 
-                              frame_shape: Tuple[int, int]) -> Dict:
+    def calculate_crowd_metrics(self, detections: Detections, 
+                              height: int, width: int) -> Dict:
         """
         Calculate crowd density and flow metrics from detections.
         
         Args:
-            detections: List of person detections
-            frame_shape: (height, width) of the frame
+            detections: SoA detection record
+            height: Frame height in pixels
+            width: Frame width in pixels
             
         Returns:
             Dictionary with crowd metrics
         """
         person_count = len(detections)
-        frame_area = frame_shape[0] * frame_shape[1]
+        bboxes = detections.bboxes
         
-        # Calculate density (people per unit area)
-        density = person_count / (frame_area / 10000)  # normalize to reasonable scale
+        # Grow the scratch buffers (by doubling) if this frame overflows
+        if person_count > self._bbox_cap:
+            while self._bbox_cap < person_count:
+                self._bbox_cap *= 2
+            self._bbox_scratch = np.empty((self._bbox_cap, 4), dtype=np.float32)
+            self._centers_scratch = np.empty((self._bbox_cap, 2), dtype=np.float32)
         
-        # Calculate center points for flow analysis
-        centers = []
-        for detection in detections:
-            bbox = detection['bbox']
-            center_x = (bbox[0] + bbox[2]) / 2
-            center_y = (bbox[1] + bbox[3]) / 2
-            centers.append((center_x, center_y))
+        # Pixel coordinates fit comfortably in float32 (24-bit mantissa);
+        # downcast at ingest so the vector path moves half the bytes and
+        # packs twice the SIMD lanes of float64. The cast lands in the
+        # reused scratch buffer instead of a fresh allocation; the mock
+        # already emits float32 so this branch is skipped there.
+        if bboxes.dtype != np.float32:
+            np.copyto(self._bbox_scratch[:person_count], bboxes, casting='unsafe')
+            bboxes = self._bbox_scratch[:person_count]
+        
+        # Centers land in the reused scratch as well; the returned view is
+        # valid only until the next calculate_crowd_metrics call on this
+        # instance — callers that hold metrics past that (queues, history
+        # buffers) must copy, as stream_process does before enqueueing
+        centers = self._centers_scratch[:person_count]
+        
+        if _HAVE_NUMBA:
+            # Single native pass computing centers and density together
+            density = _crowd_kernel(bboxes, height, width, centers)
+        else:
+            # Calculate density (people per unit area, cached scale per shape)
+            key = (height, width)
+            scale = self._density_scale.get(key)
+            if scale is None:
+                scale = 10000.0 / (height * width)
+                self._density_scale[key] = scale
+            density = person_count * scale
+            
+            # Center points for flow analysis, filled by vector assignment —
+            # no intermediate arrays or per-point tuples
+            centers[:, 0] = (bboxes[:, 0] + bboxes[:, 2]) * 0.5
+            centers[:, 1] = (bboxes[:, 1] + bboxes[:, 3]) * 0.5
         
         metrics = {
-            'timestamp': datetime.utcnow().isoformat(),
+            # Raw integer clock read; formatting a datetime string per
+            # frame is deferred to _iso() at the emission boundary
+            'timestamp_ns': time.time_ns(),
             'person_count': person_count,
             'density': density,
             'centers': centers,
-            'frame_dimensions': frame_shape
+            'frame_dimensions': (height, width)
         }
         
         return metrics
     
+    def process_frame(self, frame: np.ndarray) -> Dict:
+        """
+        Fused detect + metrics over one frame — the recommended streaming path.
+        
+        Runs detection and the metric computation in a single function
+        scope, so the detection arrays stay hot in cache between the two
+        steps instead of crossing a Python-level call boundary. The
+        detect_people_in_frame / calculate_crowd_metrics pair remains as
+        the back-compat API for callers that need the intermediate
+        Detections record.
+        
+        Args:
+            frame: Video frame as numpy array
+            
+        Returns:
+            Dictionary with crowd metrics
+        """
+        detections = self._mock_person_detection(frame)
+        return self.calculate_crowd_metrics(
+            detections, frame.shape[0], frame.shape[1]
+        )
+    
+    def stream_process(self, frames_iter, callback, prefetch: int = 8):
+        """
+        Run detection + metrics over a frame stream as a threaded pipeline.
+        
+        A reader thread prefetches frames and a writer thread drains
+        metrics to the callback, so decode, compute, and consumption
+        overlap instead of running strictly in sequence. Bounded queues
+        give back-pressure; a None sentinel shuts each stage down.
+        
+        Args:
+            frames_iter: Iterable yielding frames as numpy arrays
+            callback: Called with each frame's metrics dict
+            prefetch: Depth of the read-ahead and write-behind queues
+        """
+        read_q = queue.Queue(maxsize=prefetch)
+        write_q = queue.Queue(maxsize=prefetch)
+        
+        def _reader():
+            try:
+                for frame in frames_iter:
+                    read_q.put(frame)
+            finally:
+                read_q.put(None)
+        
+        def _writer():
+            while True:
+                metrics = write_q.get()
+                if metrics is None:
+                    break
+                callback(metrics)
+        
+        reader = threading.Thread(target=_reader, daemon=True)
+        writer = threading.Thread(target=_writer, daemon=True)
+        reader.start()
+        writer.start()
+        
+        try:
+            idx = 0
+            latency_ema = None
+            while True:
+                frame = read_q.get()
+                if frame is None:
+                    break
+                
+                idx += 1
+                if idx % self.frame_skip != 0:
+                    continue
+                
+                start = time.monotonic()
+                metrics = self.process_frame(frame)
+                # The centers array is a view into per-instance scratch that
+                # the next frame overwrites; snapshot it before the dict
+                # crosses to the writer thread
+                metrics['centers'] = metrics['centers'].copy()
+                write_q.put(metrics)
+                
+                # Adapt the skip to the latency budget: a rolling EMA of
+                # per-frame cost bumps the skip when over budget and walks
+                # it back down when comfortably under
+                if self.target_latency is not None:
+                    elapsed = time.monotonic() - start
+                    latency_ema = (elapsed if latency_ema is None
+                                   else 0.8 * latency_ema + 0.2 * elapsed)
+                    if latency_ema > self.target_latency:
+                        self.frame_skip += 1
+                    elif latency_ema < self.target_latency * 0.5 and self.frame_skip > 1:
+                        self.frame_skip -= 1
+        finally:
+            write_q.put(None)
+            reader.join(timeout=5)
+            writer.join(timeout=5)
+    
     def test_functionality(self):
         """Test basic functionality without GCP dependencies."""
         print("Testing vision processing...")
         
-        # Create a simple test frame (black image)
-        test_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        # Reuse the shared test frame (black image) across invocations
+        if CrowdVisionProcessor._TEST_FRAME is None:
+            CrowdVisionProcessor._TEST_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+        test_frame = CrowdVisionProcessor._TEST_FRAME
         
         try:
             # Test detection
@@ -100,7 +328,9 @@ class CrowdVisionProcessor:
             print(f"Successfully detected {len(detections)} people in test frame")
             
             # Test metrics calculation
-            metrics = self.calculate_crowd_metrics(detections, test_frame.shape[:2])
+            metrics = self.calculate_crowd_metrics(
+                detections, test_frame.shape[0], test_frame.shape[1]
+            )
             print(f"Calculated metrics:")
             print(f"  Person count: {metrics['person_count']}")
             print(f"  Density: {metrics['density']:.4f}")
@@ -109,6 +339,12 @@ class CrowdVisionProcessor:
             print(f"Error in vision processing: {e}")
             return False
 
+# Default logging setup, once at import rather than per instance; respects
+# any configuration the host application already installed
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO)
+
+
 # Simple test function
 if __name__ == "__main__":
     processor = CrowdVisionProcessor()
@@ -11,6 +11,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import time
+import threading
+import queue
+import shutil
+import tempfile
+import functools
+from types import MappingProxyType
 from datetime import datetime, timedelta
 import json
 from PIL import Image
@@ -22,6 +28,324 @@ from typing import Dict, List, Tuple, Optional
 # Import our live predictor
 from live_crowd_predictor import live_predictor, get_live_crowd_status, start_live_monitoring, stop_live_monitoring
 
+
+def _score_frame(gray, prev_gray, grid_h, grid_w):
+    """Grid-cell motion scoring between two grayscale frames.
+
+    Returns (active_cells, mean_motion): how many grid cells changed
+    meaningfully since the previous frame and the average per-pixel
+    absolute difference. Plain loops so numba can compile it to native
+    code below; the numpy fallback at the call site covers the rest.
+    """
+    h, w = gray.shape
+    cell_h = h // grid_h
+    cell_w = w // grid_w
+    active = 0
+    total = 0.0
+    for gy in range(grid_h):
+        for gx in range(grid_w):
+            acc = 0.0
+            y0 = gy * cell_h
+            x0 = gx * cell_w
+            for y in range(y0, y0 + cell_h):
+                for x in range(x0, x0 + cell_w):
+                    d = float(gray[y, x]) - float(prev_gray[y, x])
+                    acc += d if d >= 0 else -d
+            cell_mean = acc / (cell_h * cell_w)
+            total += cell_mean
+            if cell_mean > 8.0:
+                active += 1
+    return active, total / (grid_h * grid_w)
+
+
+# Compile the scoring kernel when numba is installed; warmed up at import
+# so the first upload doesn't pay the compile cost
+_HAVE_NUMBA = False
+try:
+    from numba import njit as _njit
+    _score_frame = _njit(cache=True, fastmath=True, nogil=True)(_score_frame)
+    _score_frame(np.zeros((64, 64), np.uint8), np.zeros((64, 64), np.uint8), 4, 4)
+    _HAVE_NUMBA = True
+except ImportError:
+    pass
+
+
+def _frame_motion(gray, prev_gray, grid_h=8, grid_w=8):
+    """Score frame-to-frame motion, via the compiled kernel when available"""
+    if _HAVE_NUMBA:
+        return _score_frame(gray, prev_gray, grid_h, grid_w)
+    
+    h = (gray.shape[0] // grid_h) * grid_h
+    w = (gray.shape[1] // grid_w) * grid_w
+    diff = np.abs(gray[:h, :w].astype(np.int16) - prev_gray[:h, :w].astype(np.int16))
+    cells = diff.reshape(grid_h, h // grid_h, grid_w, w // grid_w).mean(axis=(1, 3))
+    return int(np.count_nonzero(cells > 8.0)), float(cells.mean())
+
+
+# Test scenarios as one contiguous structured array built at import:
+# rows are scenarios, columns are zones. The display dicts are derived
+# lazily (and memoized) instead of re-allocating a nested dict tree on
+# every test run.
+_SCENARIO_ZONES = ('Main Entrance', 'Hall 1', 'Hall 2', 'Food Court', 'Parking')
+_SCENARIO_NAMES = ('Normal Operations', 'High Crowd Event', 'Emergency Simulation', 'Peak Hours')
+_SCENARIO_TABLE = np.array([
+    [(25, 'normal', 'normal'), (80, 'normal', 'normal'), (60, 'normal', 'normal'),
+     (35, 'normal', 'normal'), (45, 'normal', 'normal')],
+    [(120, 'warning', 'warning'), (350, 'critical', 'critical'), (280, 'warning', 'warning'),
+     (95, 'caution', 'caution'), (180, 'caution', 'caution')],
+    [(200, 'critical', 'critical'), (450, 'critical', 'critical'), (380, 'critical', 'critical'),
+     (120, 'warning', 'warning'), (250, 'warning', 'warning')],
+    [(85, 'caution', 'caution'), (220, 'warning', 'warning'), (180, 'caution', 'caution'),
+     (75, 'normal', 'normal'), (120, 'normal', 'normal')]
+], dtype=[('people', np.int32), ('status', 'U10'), ('alert', 'U10')])
+_SCENARIO_TABLE.setflags(write=False)
+
+
+@functools.lru_cache(maxsize=4)
+def _scenario_results(scenario: str):
+    """Read-only per-zone results for a named test scenario"""
+    if scenario in _SCENARIO_NAMES:
+        row = _SCENARIO_TABLE[_SCENARIO_NAMES.index(scenario)]
+    else:
+        row = _SCENARIO_TABLE[0]  # Normal Operations
+    
+    return MappingProxyType({
+        zone: MappingProxyType({
+            'people': int(row['people'][i]),
+            'status': str(row['status'][i]),
+            'alert': str(row['alert'][i])
+        })
+        for i, zone in enumerate(_SCENARIO_ZONES)
+    })
+
+
+def _status_digest(status: Dict) -> int:
+    """Cheap fingerprint of the live status used to skip no-op reruns"""
+    overall = status.get('overall_status', {})
+    current = status.get('current_analysis') or {}
+    return hash((
+        overall.get('total_estimated_people'),
+        overall.get('overall_alert_level'),
+        overall.get('critical_zones'),
+        current.get('people_count'),
+        current.get('density_score')
+    ))
+
+
+# Page CSS as a module constant: built once at import, no per-run string
+# construction or interpolation
+_CSS = """
+<style>
+.main-header {
+    background: linear-gradient(90deg, #FF6B6B, #4ECDC4);
+    padding: 1rem;
+    border-radius: 10px;
+    color: white;
+    text-align: center;
+    margin-bottom: 2rem;
+}
+.alert-critical {
+    background: #ffebee;
+    border-left: 4px solid #f44336;
+    padding: 1rem;
+    border-radius: 5px;
+    margin: 1rem 0;
+}
+.alert-warning {
+    background: #fff3e0;
+    border-left: 4px solid #ff9800;
+    padding: 1rem;
+    border-radius: 5px;
+    margin: 1rem 0;
+}
+.alert-normal {
+    background: #e8f5e8;
+    border-left: 4px solid #4caf50;
+    padding: 1rem;
+    border-radius: 5px;
+    margin: 1rem 0;
+}
+.zone-card {
+    background: #f8f9fa;
+    padding: 1rem;
+    border-radius: 8px;
+    border: 1px solid #dee2e6;
+    margin: 0.5rem 0;
+}
+</style>
+"""
+
+
+def _inject_css():
+    """Emit the page CSS for this run.
+
+    The <style> element is part of each run's element tree, so it has
+    to be emitted per run — a cache_resource one-shot would drop the
+    styles on every rerun after the first. The constant above keeps the
+    per-run cost to a single markdown call on a prebuilt string, and
+    Streamlit dedupes the unchanged element client-side.
+    """
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+
+# Alert-level -> (icon, st method name) lookups, replacing the if/elif
+# chains that were copied around the monitoring page. Banner styles are
+# for the sidebar status, message styles for the alert feed.
+_ALERT_BANNER_STYLE = {
+    'critical': ('🚨 CRITICAL ALERT', 'error'),
+    'warning': ('⚠️ WARNING', 'warning'),
+    'caution': ('⚠️ CAUTION', 'warning')
+}
+_ALERT_MSG_STYLE = {
+    'critical': ('🚨', 'error'),
+    'warning': ('⚠️', 'warning')
+}
+_TREND_EMOJI = {'increasing': '🔴', 'decreasing': '🟢'}
+_RISK_EMOJI = {'high': '🔴', 'medium': '🟡'}
+
+
+def _trend_emoji(trend: str) -> str:
+    """Emoji for a trend string ('slowly increasing' etc. still match)"""
+    for key, emoji in _TREND_EMOJI.items():
+        if key in trend:
+            return emoji
+    return '🟡'
+
+
+# Zone-card CSS class + badge per status; default is the normal style
+_ZONE_CARD_STYLE = {
+    'critical': ('alert-critical', '🔴'),
+    'warning': ('alert-warning', '🟡')
+}
+
+
+def iter_sampled_frames(video_path: str, target_fps: float = 1.0):
+    """Yield decoded frames from a video at roughly target_fps.
+
+    Uses cap.grab() to advance the demuxer without decoding and only
+    pays the full retrieve() decode for the sampled frames — crowd
+    analysis needs ~1 FPS, so 29 of every 30 frames skip the expensive
+    IDCT + color conversion entirely.
+
+    Yields (frame_index, frame) tuples; frame_index is 1-based.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return
+    
+    src_fps = cap.get(cv2.CAP_PROP_FPS)
+    if not src_fps or src_fps <= 0:
+        src_fps = 30.0
+    stride = max(int(round(src_fps / target_fps)), 1)
+    
+    frame_idx = 0
+    try:
+        while cap.grab():
+            frame_idx += 1
+            if frame_idx % stride == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    yield frame_idx, frame
+    finally:
+        cap.release()
+
+
+@st.cache_data(ttl=3600)
+def _build_venue_map():
+    """Build the static Bangalore venue layout map (cached for an hour).
+
+    The layout is hardcoded, so rebuilding and re-serializing the Plotly
+    figure on every rerun is pure waste.
+    """
+    venue_data = {
+        'Zone': ['Main Entrance', 'Hall 1', 'Hall 2', 'Food Court', 'Parking'],
+        'Lat': [13.0360, 13.0358, 13.0356, 13.0354, 13.0362],
+        'Lng': [77.6430, 77.6432, 77.6434, 77.6428, 77.6425],
+        'Capacity': [200, 500, 500, 150, 300]
+    }
+    
+    df = pd.DataFrame(venue_data)
+    
+    fig = px.scatter_mapbox(
+        df, 
+        lat="Lat", 
+        lon="Lng",
+        hover_name="Zone",
+        hover_data=["Capacity"],
+        color="Capacity",
+        size="Capacity",
+        color_continuous_scale="Viridis",
+        size_max=15,
+        zoom=16,
+        mapbox_style="open-street-map",
+        title="Bangalore Exhibition Center - Zone Layout"
+    )
+    
+    fig.update_layout(height=500)
+    return fig
+
+
+@st.cache_data(ttl=60)
+def _build_zone_bar_chart(zone_snapshot: tuple):
+    """Build the zone-distribution bar chart for a crowd snapshot.
+
+    Keyed on ((zone, estimate), ...) tuples so two refreshes with the
+    same numbers reuse the cached figure instead of re-running px.bar
+    and its JSON serialization.
+    """
+    zone_names = [name for name, _ in zone_snapshot]
+    crowd_estimates = [estimate for _, estimate in zone_snapshot]
+    
+    fig = px.bar(
+        x=[name.replace('_', ' ').title() for name in zone_names],
+        y=crowd_estimates,
+        title="Current Crowd Distribution by Zone",
+        labels={'x': 'Zone', 'y': 'Estimated People'},
+        color=crowd_estimates,
+        color_continuous_scale="RdYlGn_r"
+    )
+    
+    return fig
+
+
+# Simulated 24-hour crowd patterns: values are all 0-500, so one
+# contiguous int16 table (rows = zones) built once at import replaces
+# per-rerun list literals; Plotly serializes ndarrays faster too
+_PATTERN_ZONES = ('Main Entrance', 'Hall 1', 'Food Court')
+_PATTERNS = np.array([
+    [20, 15, 10, 8, 12, 25, 45, 80, 60, 40, 35, 50, 70, 65, 55, 60, 85, 90, 75, 60, 45, 35, 30, 25],
+    [30, 20, 15, 10, 15, 35, 60, 120, 100, 80, 70, 90, 110, 105, 95, 100, 130, 140, 120, 100, 80, 60, 50, 40],
+    [10, 5, 3, 2, 5, 15, 25, 40, 35, 30, 45, 80, 90, 85, 70, 75, 85, 80, 60, 40, 25, 20, 15, 12]
+], dtype=np.int16)
+_PATTERNS.setflags(write=False)
+_PATTERN_HOURS = np.arange(24, dtype=np.int16)
+_PATTERN_HOURS.setflags(write=False)
+
+
+@st.cache_data(ttl=3600)
+def _build_history_chart():
+    """Build the simulated 24-hour pattern chart (cached for an hour)"""
+    fig = go.Figure()
+    
+    for i, zone in enumerate(_PATTERN_ZONES):
+        fig.add_trace(go.Scatter(
+            x=_PATTERN_HOURS,
+            y=_PATTERNS[i],
+            mode='lines+markers',
+            name=zone,
+            line=dict(width=3)
+        ))
+    
+    fig.update_layout(
+        title="24-Hour Crowd Pattern Analysis",
+        xaxis_title="Hour of Day",
+        yaxis_title="Estimated People",
+        hovermode='x unified'
+    )
+    
+    return fig
+
+
 class CrowdPredictionUI:
     def __init__(self):
         self.setup_page()
@@ -35,50 +359,27 @@ class CrowdPredictionUI:
             initial_sidebar_state="expanded"
         )
         
-        # Custom CSS
-        st.markdown("""
-        <style>
-        .main-header {
-            background: linear-gradient(90deg, #FF6B6B, #4ECDC4);
-            padding: 1rem;
-            border-radius: 10px;
-            color: white;
-            text-align: center;
-            margin-bottom: 2rem;
-        }
-        .alert-critical {
-            background: #ffebee;
-            border-left: 4px solid #f44336;
-            padding: 1rem;
-            border-radius: 5px;
-            margin: 1rem 0;
-        }
-        .alert-warning {
-            background: #fff3e0;
-            border-left: 4px solid #ff9800;
-            padding: 1rem;
-            border-radius: 5px;
-            margin: 1rem 0;
-        }
-        .alert-normal {
-            background: #e8f5e8;
-            border-left: 4px solid #4caf50;
-            padding: 1rem;
-            border-radius: 5px;
-            margin: 1rem 0;
-        }
-        .zone-card {
-            background: #f8f9fa;
-            padding: 1rem;
-            border-radius: 8px;
-            border: 1px solid #dee2e6;
-            margin: 0.5rem 0;
-        }
-        </style>
-        """, unsafe_allow_html=True)
+        # Custom CSS (module constant, one markdown call)
+        _inject_css()
+
+    def _get_status_once(self) -> Dict:
+        """Fetch get_live_crowd_status() at most once per script run.
 
+        Every section of a page used to make its own call; the snapshot
+        is cached in session state for the duration of the run (cleared
+        at the top of run()), so a render reads the predictor once.
+        """
+        status = st.session_state.get('_status_this_run')
+        if status is None:
+            status = get_live_crowd_status()
+            st.session_state['_status_this_run'] = status
+        return status
+    
     def run(self):
         """Main UI runner"""
+        # One status snapshot per script run
+        st.session_state.pop('_status_this_run', None)
+        
         # Header
         st.markdown("""
         <div class="main-header">
@@ -136,18 +437,12 @@ class CrowdPredictionUI:
         
         # Quick status
         if st.session_state['monitoring_active']:
-            status = get_live_crowd_status()
+            status = self._get_status_once()
             overall = status.get('overall_status', {})
             
             alert_level = overall.get('overall_alert_level', 'normal')
-            if alert_level == 'critical':
-                st.sidebar.error(f"🚨 CRITICAL ALERT")
-            elif alert_level == 'warning':
-                st.sidebar.warning(f"⚠️ WARNING")
-            elif alert_level == 'caution':
-                st.sidebar.warning(f"⚠️ CAUTION")
-            else:
-                st.sidebar.success(f"✅ NORMAL")
+            banner, method = _ALERT_BANNER_STYLE.get(alert_level, ('✅ NORMAL', 'success'))
+            getattr(st.sidebar, method)(banner)
             
             st.sidebar.metric("Total People", overall.get('total_estimated_people', 0))
             st.sidebar.metric("Critical Zones", overall.get('critical_zones', 0))
@@ -160,6 +455,104 @@ class CrowdPredictionUI:
         st.session_state['alert_threshold'] = st.sidebar.slider("Alert Threshold", 1, 10, 7)
         st.session_state['auto_refresh'] = st.sidebar.checkbox("Auto Refresh", value=True)
 
+    def _ensure_worker(self):
+        """Start the background status-polling worker once per session.
+
+        The worker calls get_live_crowd_status() and grabs the latest
+        video frame off the Streamlit script thread, pushing a small
+        package onto a size-1 queue (drop-oldest, so the producer never
+        blocks). The UI just pops the freshest package instead of
+        stalling the script thread with its own polling.
+        """
+        if '_live_worker' in st.session_state:
+            return st.session_state['_live_queue']
+        
+        pkg_queue = queue.Queue(maxsize=1)
+        stop_event = threading.Event()
+        
+        def _poll():
+            while not stop_event.is_set():
+                try:
+                    pkg = {
+                        'status': get_live_crowd_status(),
+                        'frame': live_predictor.live_data.get('video_feed'),
+                        'fetched_at': time.time()
+                    }
+                    # Drop-oldest: keep only the freshest package
+                    try:
+                        pkg_queue.get_nowait()
+                    except queue.Empty:
+                        pass
+                    try:
+                        pkg_queue.put_nowait(pkg)
+                    except queue.Full:
+                        pass
+                except Exception:
+                    pass
+                stop_event.wait(2)
+        
+        worker = threading.Thread(target=_poll, daemon=True)
+        worker.start()
+        
+        st.session_state['_live_worker'] = worker
+        st.session_state['_live_queue'] = pkg_queue
+        st.session_state['_live_stop'] = stop_event
+        return pkg_queue
+    
+    def _render_live_analysis(self, status, frame, video_placeholder):
+        """Render the live frame and current-analysis metrics block"""
+        current_analysis = status.get('current_analysis')
+        
+        if not current_analysis:
+            st.info("📹 Waiting for video analysis data...")
+            return
+        
+        # Display current frame (if available). Encode to JPEG bytes
+        # ourselves: cv2 encodes BGR natively (no cvtColor copy) and the
+        # bytes pass straight through to the browser, skipping the slow
+        # PNG encode st.image does for raw arrays.
+        if frame is not None:
+            if frame.shape[0] > 720:
+                scale = 720 / frame.shape[0]
+                frame = cv2.resize(frame, None, fx=scale, fy=scale,
+                                   interpolation=cv2.INTER_AREA)
+            ok, jpg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+            if ok:
+                video_placeholder.image(jpg.tobytes(), caption="Live Video Feed",
+                                        use_column_width=True)
+        
+        # Current analysis metrics
+        st.subheader("📊 Current Analysis")
+        col_a, col_b, col_c, col_d = st.columns(4)
+        
+        with col_a:
+            st.metric("People Count", current_analysis.get('people_count', 0))
+        with col_b:
+            st.metric("Density Score", f"{current_analysis.get('density_score', 0)}/10")
+        with col_c:
+            st.metric("Movement", current_analysis.get('movement_type', 'Unknown').title())
+        with col_d:
+            alert_level = current_analysis.get('alert_level', 'normal')
+            st.metric("Alert Level", alert_level.upper())
+        
+        # Flow direction
+        flow_direction = current_analysis.get('flow_direction', 'unknown')
+        st.info(f"🌊 Crowd Flow Direction: {flow_direction.title()}")
+        
+        # Safety concerns
+        safety_concerns = current_analysis.get('safety_concerns', [])
+        if safety_concerns:
+            st.warning("⚠️ Safety Concerns Detected:")
+            for concern in safety_concerns:
+                st.write(f"• {concern}")
+        
+        # Bottlenecks
+        bottlenecks = current_analysis.get('bottlenecks', [])
+        if bottlenecks:
+            st.error("🚧 Bottlenecks Detected:")
+            for bottleneck in bottlenecks:
+                st.write(f"• {bottleneck}")
+    
     def live_monitoring_page(self):
         """Live monitoring main page"""
         st.header("🎥 Live Video Feed & Crowd Prediction")
@@ -193,8 +586,16 @@ class CrowdPredictionUI:
                 if uploaded_video:
                     st.success(f"✅ Video uploaded: {uploaded_video.name}")
                     
-                    # Display video
-                    st.video(uploaded_video)
+                    # Display video — cache the bytes per upload so every
+                    # rerun hands Streamlit the same object; the media
+                    # manager then serves the same blob URL and the
+                    # browser keeps its <video> element instead of
+                    # re-fetching a multi-MB file each refresh
+                    video_key = (uploaded_video.name, uploaded_video.size)
+                    if st.session_state.get('_last_video_key') != video_key:
+                        st.session_state['_last_video_key'] = video_key
+                        st.session_state['_last_video_bytes'] = uploaded_video.getvalue()
+                    st.video(st.session_state['_last_video_bytes'])
                 
                 # Location input
                 st.subheader("📍 Venue Location")
@@ -234,26 +635,49 @@ class CrowdPredictionUI:
                 # Analysis button
                 if uploaded_video and venue_location:
                     if st.button("🚀 Start Video Analysis", type="primary"):
-                        with st.spinner("🔄 Analyzing uploaded video..."):
-                            # Save uploaded video temporarily
-                            temp_video_path = f"temp_video_{int(time.time())}.mp4"
-                            with open(temp_video_path, "wb") as f:
-                                f.write(uploaded_video.read())
-                            
-                            # Run analysis with location
-                            analysis_result = self._analyze_uploaded_video(temp_video_path, venue_location, venue_info)
-                            
-                            # Store results
-                            st.session_state['uploaded_video_analysis'] = analysis_result
-                            st.session_state['venue_location'] = venue_location
-                            st.session_state['venue_info'] = venue_info
-                            
-                            # Clean up temp file
-                            import os
-                            if os.path.exists(temp_video_path):
-                                os.remove(temp_video_path)
+                        # Stream the upload to disk in 1 MB chunks; .read()
+                        # would pull the whole video into memory first
+                        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as f:
+                            temp_video_path = f.name
+                            uploaded_video.seek(0)
+                            shutil.copyfileobj(uploaded_video, f, length=1 << 20)
+                        
+                        # Stream partial results into placeholders as each
+                        # frame is scored, so the first metric shows up
+                        # after one frame instead of after the whole video
+                        progress_ph = st.empty()
+                        metric_ph = st.empty()
+                        analysis_result = {'error': 'Could not analyze video frames'}
+                        
+                        for partial in self._analyze_uploaded_video_iter(temp_video_path, venue_location, venue_info):
+                            if partial.get('final'):
+                                analysis_result = partial['result']
+                                break
                             
-                            st.success("✅ Video analysis complete!")
+                            progress_ph.info(
+                                f"🔄 Analyzing... frame {partial['frame_idx']} "
+                                f"({partial['analyses_performed']}/10 samples)"
+                            )
+                            with metric_ph.container():
+                                col_p1, col_p2, col_p3 = st.columns(3)
+                                col_p1.metric("People", partial['people_count'])
+                                col_p2.metric("Density", f"{partial['density_score']}/10")
+                                col_p3.metric("Flow", partial['flow_direction'].title())
+                        
+                        progress_ph.empty()
+                        metric_ph.empty()
+                        
+                        # Store results
+                        st.session_state['uploaded_video_analysis'] = analysis_result
+                        st.session_state['venue_location'] = venue_location
+                        st.session_state['venue_info'] = venue_info
+                        
+                        # Clean up temp file
+                        import os
+                        if os.path.exists(temp_video_path):
+                            os.remove(temp_video_path)
+                        
+                        st.success("✅ Video analysis complete!")
             
             # Display uploaded video analysis results
             if 'uploaded_video_analysis' in st.session_state:
@@ -280,55 +704,50 @@ class CrowdPredictionUI:
                 if 'venue_location' in st.session_state and 'venue_info' in st.session_state:
                     self._show_crowd_flow_map(st.session_state['venue_location'], analysis, st.session_state['venue_info'])
             
-            # Video display placeholder
-            video_placeholder = st.empty()
-            
-            # Current frame analysis
+            # Current frame analysis — fed by the background worker so the
+            # script thread never polls or sleeps itself
             if st.session_state.get('monitoring_active', False):
-                status = get_live_crowd_status()
-                current_analysis = status.get('current_analysis')
+                pkg_queue = self._ensure_worker()
                 
-                if current_analysis:
-                    # Display current frame (if available)
-                    if live_predictor.live_data.get('video_feed') is not None:
-                        frame = live_predictor.live_data['video_feed']
-                        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        video_placeholder.image(frame_rgb, caption="Live Video Feed", use_column_width=True)
-                    
-                    # Current analysis metrics
-                    st.subheader("📊 Current Analysis")
-                    col_a, col_b, col_c, col_d = st.columns(4)
-                    
-                    with col_a:
-                        st.metric("People Count", current_analysis.get('people_count', 0))
-                    with col_b:
-                        st.metric("Density Score", f"{current_analysis.get('density_score', 0)}/10")
-                    with col_c:
-                        st.metric("Movement", current_analysis.get('movement_type', 'Unknown').title())
-                    with col_d:
-                        alert_level = current_analysis.get('alert_level', 'normal')
-                        st.metric("Alert Level", alert_level.upper())
-                    
-                    # Flow direction
-                    flow_direction = current_analysis.get('flow_direction', 'unknown')
-                    st.info(f"🌊 Crowd Flow Direction: {flow_direction.title()}")
-                    
-                    # Safety concerns
-                    safety_concerns = current_analysis.get('safety_concerns', [])
-                    if safety_concerns:
-                        st.warning("⚠️ Safety Concerns Detected:")
-                        for concern in safety_concerns:
-                            st.write(f"• {concern}")
+                if hasattr(st, 'fragment'):
+                    # Fragment reruns only this block every 2 s instead of
+                    # re-executing the whole page script. Everything it
+                    # writes to — the video placeholder included — must be
+                    # created inside the fragment body: fragment reruns
+                    # may not write to containers made outside it.
+                    @st.fragment(run_every=2)
+                    def _live_tick():
+                        video_placeholder = st.empty()
+                        try:
+                            pkg = pkg_queue.get_nowait()
+                            st.session_state['_live_pkg'] = pkg
+                        except queue.Empty:
+                            pkg = st.session_state.get('_live_pkg')
+                        
+                        if pkg:
+                            self._render_live_analysis(
+                                pkg['status'], pkg['frame'], video_placeholder
+                            )
+                        else:
+                            st.info("📹 Waiting for video analysis data...")
                     
-                    # Bottlenecks
-                    bottlenecks = current_analysis.get('bottlenecks', [])
-                    if bottlenecks:
-                        st.error("🚧 Bottlenecks Detected:")
-                        for bottleneck in bottlenecks:
-                            st.write(f"• {bottleneck}")
-                
+                    _live_tick()
                 else:
-                    st.info("📹 Waiting for video analysis data...")
+                    # Older Streamlit: render the freshest package directly;
+                    # the page-level auto refresh keeps it ticking
+                    video_placeholder = st.empty()
+                    try:
+                        pkg = pkg_queue.get_nowait()
+                        st.session_state['_live_pkg'] = pkg
+                    except queue.Empty:
+                        pkg = st.session_state.get('_live_pkg')
+                    
+                    if pkg:
+                        self._render_live_analysis(
+                            pkg['status'], pkg['frame'], video_placeholder
+                        )
+                    else:
+                        st.info("📹 Waiting for video analysis data...")
             else:
                 st.info("👆 Start live monitoring from sidebar to begin analysis")
         
@@ -336,7 +755,7 @@ class CrowdPredictionUI:
             st.subheader("🔮 15-20 Min Predictions")
             
             if st.session_state.get('monitoring_active', False):
-                status = get_live_crowd_status()
+                status = self._get_status_once()
                 prediction = status.get('latest_prediction')
                 
                 if prediction:
@@ -359,15 +778,12 @@ class CrowdPredictionUI:
                     people_trend = prediction.get('people_trend', 'stable')
                     density_trend = prediction.get('density_trend', 'stable')
                     
-                    trend_color = "🔴" if "increasing" in people_trend else "🟢" if "decreasing" in people_trend else "🟡"
-                    st.write(f"{trend_color} People Trend: {people_trend.title()}")
-                    
-                    trend_color = "🔴" if "increasing" in density_trend else "🟢" if "decreasing" in density_trend else "🟡"
-                    st.write(f"{trend_color} Density Trend: {density_trend.title()}")
+                    st.write(f"{_trend_emoji(people_trend)} People Trend: {people_trend.title()}")
+                    st.write(f"{_trend_emoji(density_trend)} Density Trend: {density_trend.title()}")
                     
                     # Bottleneck risk
                     bottleneck_risk = prediction.get('bottleneck_risk', 'low')
-                    risk_color = "🔴" if bottleneck_risk == 'high' else "🟡" if bottleneck_risk == 'medium' else "🟢"
+                    risk_color = _RISK_EMOJI.get(bottleneck_risk, '🟢')
                     st.write(f"{risk_color} Bottleneck Risk: {bottleneck_risk.title()}")
                     
                     # Confidence
@@ -382,7 +798,7 @@ class CrowdPredictionUI:
             st.subheader("🚨 Recent Alerts")
             
             if st.session_state.get('monitoring_active', False):
-                status = get_live_crowd_status()
+                status = self._get_status_once()
                 alerts = status.get('recent_alerts', [])
                 
                 if alerts:
@@ -391,12 +807,8 @@ class CrowdPredictionUI:
                         alert_time = alert.get('timestamp', datetime.now())
                         alert_message = alert.get('message', 'No message')
                         
-                        if alert_level == 'critical':
-                            st.error(f"🚨 {alert_time.strftime('%H:%M')} - {alert_message}")
-                        elif alert_level == 'warning':
-                            st.warning(f"⚠️ {alert_time.strftime('%H:%M')} - {alert_message}")
-                        else:
-                            st.info(f"ℹ️ {alert_time.strftime('%H:%M')} - {alert_message}")
+                        icon, method = _ALERT_MSG_STYLE.get(alert_level, ('ℹ️', 'info'))
+                        getattr(st, method)(f"{icon} {alert_time.strftime('%H:%M')} - {alert_message}")
                 else:
                     st.success("✅ No recent alerts")
         
@@ -405,54 +817,54 @@ class CrowdPredictionUI:
         st.subheader("🗺️ Maps Integration & Zone Analysis")
         
         if st.session_state.get('monitoring_active', False):
-            status = get_live_crowd_status()
+            status = self._get_status_once()
             zone_analyses = status.get('zone_analyses', {})
             
             if zone_analyses:
-                # Zone cards
-                cols = st.columns(len(zone_analyses))
+                # One pre-rendered HTML blob for all zone cards: a single
+                # element delta per refresh instead of one per zone, with
+                # the status style picked by dict lookup
+                card_parts = []
+                for zone_name, zone_data in zone_analyses.items():
+                    zone_status = zone_data.get('zone_status', 'normal')
+                    crowd_estimate = zone_data.get('combined_crowd_estimate', 0)
+                    css_class, badge = _ZONE_CARD_STYLE.get(
+                        zone_status, ('alert-normal', '🟢')
+                    )
+                    card_parts.append(f"""
+                    <div class="{css_class}">
+                        <h4>{badge} {zone_name.replace('_', ' ').title()}</h4>
+                        <p><strong>Status:</strong> {zone_status.upper()}</p>
+                        <p><strong>Estimated People:</strong> {crowd_estimate}</p>
+                    </div>
+                    """)
                 
-                for i, (zone_name, zone_data) in enumerate(zone_analyses.items()):
-                    with cols[i % len(cols)]:
-                        zone_status = zone_data.get('zone_status', 'normal')
-                        crowd_estimate = zone_data.get('combined_crowd_estimate', 0)
-                        
-                        # Zone card styling based on status
-                        if zone_status == 'critical':
-                            st.markdown(f"""
-                            <div class="alert-critical">
-                                <h4>🔴 {zone_name.replace('_', ' ').title()}</h4>
-                                <p><strong>Status:</strong> {zone_status.upper()}</p>
-                                <p><strong>Estimated People:</strong> {crowd_estimate}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        elif zone_status == 'warning':
-                            st.markdown(f"""
-                            <div class="alert-warning">
-                                <h4>🟡 {zone_name.replace('_', ' ').title()}</h4>
-                                <p><strong>Status:</strong> {zone_status.upper()}</p>
-                                <p><strong>Estimated People:</strong> {crowd_estimate}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            st.markdown(f"""
-                            <div class="alert-normal">
-                                <h4>🟢 {zone_name.replace('_', ' ').title()}</h4>
-                                <p><strong>Status:</strong> {zone_status.upper()}</p>
-                                <p><strong>Estimated People:</strong> {crowd_estimate}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        # Zone recommendations
-                        recommendations = zone_data.get('recommendations', [])
-                        if recommendations:
-                            st.write("**Actions:**")
-                            for rec in recommendations:
-                                st.write(f"• {rec}")
-        
-        # Auto refresh
+                st.empty().markdown(''.join(card_parts), unsafe_allow_html=True)
+                
+                # Zone recommendations
+                for zone_name, zone_data in zone_analyses.items():
+                    recommendations = zone_data.get('recommendations', [])
+                    if recommendations:
+                        st.write(f"**{zone_name.replace('_', ' ').title()} Actions:**")
+                        for rec in recommendations:
+                            st.write(f"• {rec}")
+        
+        # Auto refresh — Streamlit can only service widget events between
+        # st.* calls, so the script must never block longer than the old
+        # 2 s cadence. Within that window the digest is polled every
+        # 0.5 s: a change reruns immediately (fresher than before), and
+        # an unchanged digest reruns at the 2 s mark anyway — cheap,
+        # since the charts are memoized on their inputs.
         if st.session_state.get('auto_refresh', False) and st.session_state.get('monitoring_active', False):
-            time.sleep(2)
+            last_digest = st.session_state.get('_last_digest')
+            digest = last_digest
+            deadline = time.time() + 2
+            while time.time() < deadline:
+                time.sleep(0.5)
+                digest = _status_digest(get_live_crowd_status())
+                if digest != last_digest:
+                    break
+            st.session_state['_last_digest'] = digest
             st.rerun()
 
     def bangalore_test_page(self):
@@ -471,34 +883,8 @@ class CrowdPredictionUI:
         with col1:
             st.subheader("🗺️ Venue Layout")
             
-            # Create a simple venue map visualization
-            venue_data = {
-                'Zone': ['Main Entrance', 'Hall 1', 'Hall 2', 'Food Court', 'Parking'],
-                'Lat': [13.0360, 13.0358, 13.0356, 13.0354, 13.0362],
-                'Lng': [77.6430, 77.6432, 77.6434, 77.6428, 77.6425],
-                'Capacity': [200, 500, 500, 150, 300]
-            }
-            
-            df = pd.DataFrame(venue_data)
-            
-            # Create map
-            fig = px.scatter_mapbox(
-                df, 
-                lat="Lat", 
-                lon="Lng",
-                hover_name="Zone",
-                hover_data=["Capacity"],
-                color="Capacity",
-                size="Capacity",
-                color_continuous_scale="Viridis",
-                size_max=15,
-                zoom=16,
-                mapbox_style="open-street-map",
-                title="Bangalore Exhibition Center - Zone Layout"
-            )
-            
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            # Static layout map comes from the hour-long cache
+            st.plotly_chart(_build_venue_map(), use_container_width=True)
         
         with col2:
             st.subheader("🎯 Test Controls")
@@ -530,90 +916,26 @@ class CrowdPredictionUI:
         st.subheader("📊 Zone-wise Analysis")
         
         if st.session_state.get('monitoring_active', False):
-            status = get_live_crowd_status()
+            status = self._get_status_once()
             zone_analyses = status.get('zone_analyses', {})
             
-            # Create zone comparison chart
+            # Create zone comparison chart (memoized on the snapshot, so
+            # stable crowd numbers across refreshes reuse the figure)
             if zone_analyses:
-                zone_names = list(zone_analyses.keys())
-                crowd_estimates = [zone_analyses[zone]['combined_crowd_estimate'] for zone in zone_names]
-                
-                fig = px.bar(
-                    x=[name.replace('_', ' ').title() for name in zone_names],
-                    y=crowd_estimates,
-                    title="Current Crowd Distribution by Zone",
-                    labels={'x': 'Zone', 'y': 'Estimated People'},
-                    color=crowd_estimates,
-                    color_continuous_scale="RdYlGn_r"
+                zone_snapshot = tuple(
+                    (zone, zone_analyses[zone]['combined_crowd_estimate'])
+                    for zone in zone_analyses
                 )
-                
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(_build_zone_bar_chart(zone_snapshot), use_container_width=True)
         
         # Historical data simulation
         st.subheader("📈 Historical Patterns (Simulated)")
         
-        # Generate sample historical data
-        hours = list(range(24))
-        crowd_patterns = {
-            'Main Entrance': [20, 15, 10, 8, 12, 25, 45, 80, 60, 40, 35, 50, 70, 65, 55, 60, 85, 90, 75, 60, 45, 35, 30, 25],
-            'Hall 1': [30, 20, 15, 10, 15, 35, 60, 120, 100, 80, 70, 90, 110, 105, 95, 100, 130, 140, 120, 100, 80, 60, 50, 40],
-            'Food Court': [10, 5, 3, 2, 5, 15, 25, 40, 35, 30, 45, 80, 90, 85, 70, 75, 85, 80, 60, 40, 25, 20, 15, 12]
-        }
-        
-        fig = go.Figure()
-        
-        for zone, pattern in crowd_patterns.items():
-            fig.add_trace(go.Scatter(
-                x=hours,
-                y=pattern,
-                mode='lines+markers',
-                name=zone,
-                line=dict(width=3)
-            ))
-        
-        fig.update_layout(
-            title="24-Hour Crowd Pattern Analysis",
-            xaxis_title="Hour of Day",
-            yaxis_title="Estimated People",
-            hovermode='x unified'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_build_history_chart(), use_container_width=True)
 
     def _simulate_test_scenario(self, scenario: str) -> Dict:
-        """Test scenario simulate karta hai"""
-        scenarios = {
-            "Normal Operations": {
-                "Main Entrance": {"people": 25, "status": "normal", "alert": "normal"},
-                "Hall 1": {"people": 80, "status": "normal", "alert": "normal"},
-                "Hall 2": {"people": 60, "status": "normal", "alert": "normal"},
-                "Food Court": {"people": 35, "status": "normal", "alert": "normal"},
-                "Parking": {"people": 45, "status": "normal", "alert": "normal"}
-            },
-            "High Crowd Event": {
-                "Main Entrance": {"people": 120, "status": "warning", "alert": "warning"},
-                "Hall 1": {"people": 350, "status": "critical", "alert": "critical"},
-                "Hall 2": {"people": 280, "status": "warning", "alert": "warning"},
-                "Food Court": {"people": 95, "status": "caution", "alert": "caution"},
-                "Parking": {"people": 180, "status": "caution", "alert": "caution"}
-            },
-            "Emergency Simulation": {
-                "Main Entrance": {"people": 200, "status": "critical", "alert": "critical"},
-                "Hall 1": {"people": 450, "status": "critical", "alert": "critical"},
-                "Hall 2": {"people": 380, "status": "critical", "alert": "critical"},
-                "Food Court": {"people": 120, "status": "warning", "alert": "warning"},
-                "Parking": {"people": 250, "status": "warning", "alert": "warning"}
-            },
-            "Peak Hours": {
-                "Main Entrance": {"people": 85, "status": "caution", "alert": "caution"},
-                "Hall 1": {"people": 220, "status": "warning", "alert": "warning"},
-                "Hall 2": {"people": 180, "status": "caution", "alert": "caution"},
-                "Food Court": {"people": 75, "status": "normal", "alert": "normal"},
-                "Parking": {"people": 120, "status": "normal", "alert": "normal"}
-            }
-        }
-        
-        return scenarios.get(scenario, scenarios["Normal Operations"])
+        """Test scenario simulate karta hai (memoized, read-only view)"""
+        return _scenario_results(scenario)
 
     def analytics_dashboard(self):
         """Analytics dashboard page"""
@@ -624,7 +946,7 @@ class CrowdPredictionUI:
             return
         
         # Get current status
-        status = get_live_crowd_status()
+        status = self._get_status_once()
         
         # Overall metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -644,27 +966,30 @@ class CrowdPredictionUI:
         if live_predictor.live_data['crowd_history']:
             st.subheader("📈 Crowd History")
             
-            history_data = []
-            for entry in live_predictor.live_data['crowd_history'][-20:]:  # Last 20 entries
-                history_data.append({
-                    'Time': entry['timestamp'].strftime('%H:%M:%S'),
-                    'People Count': entry.get('people_count', 0),
-                    'Density Score': entry.get('density_score', 0),
-                    'Alert Level': entry.get('alert_level', 'normal')
-                })
-            
-            df = pd.DataFrame(history_data)
+            # Last 20 entries, pulled straight into typed SoA arrays —
+            # no per-entry dicts and no intermediate DataFrame; Plotly
+            # serializes ndarrays faster than Python lists
+            window = live_predictor.live_data['crowd_history'][-20:]
+            times = [entry['timestamp'].strftime('%H:%M:%S') for entry in window]
+            people = np.fromiter(
+                (entry.get('people_count', 0) for entry in window),
+                dtype=np.int32, count=len(window)
+            )
+            density = np.fromiter(
+                (entry.get('density_score', 0) for entry in window),
+                dtype=np.float32, count=len(window)
+            )
             
             # Create dual-axis chart
             fig = make_subplots(specs=[[{"secondary_y": True}]])
             
             fig.add_trace(
-                go.Scatter(x=df['Time'], y=df['People Count'], name="People Count", line=dict(color='blue')),
+                go.Scatter(x=times, y=people, name="People Count", line=dict(color='blue')),
                 secondary_y=False,
             )
             
             fig.add_trace(
-                go.Scatter(x=df['Time'], y=df['Density Score'], name="Density Score", line=dict(color='red')),
+                go.Scatter(x=times, y=density, name="Density Score", line=dict(color='red')),
                 secondary_y=True,
             )
             
@@ -718,7 +1043,7 @@ class CrowdPredictionUI:
                 with col2:
                     # Zone status
                     if st.session_state.get('monitoring_active', False):
-                        status = get_live_crowd_status()
+                        status = self._get_status_once()
                         zone_analyses = status.get('zone_analyses', {})
                         
                         if zone_name in zone_analyses:
@@ -1047,40 +1372,60 @@ class CrowdPredictionUI:
         else:
             return 'Low'
 
-    def _analyze_uploaded_video(self, video_path: str, location: Tuple[float, float], venue_info: Dict) -> Dict:
-        """Uploaded video ko analyze karta hai"""
+    def _analyze_uploaded_video_iter(self, video_path: str, location: Tuple[float, float], venue_info: Dict):
+        """Analyze an uploaded video incrementally.
+
+        Yields a partial result dict after every analyzed frame so the UI
+        can show the first metric after one frame of decode + score
+        instead of waiting for the whole video; the last item carries
+        {'final': True, 'result': <aggregated dict>}.
+        """
         try:
             # Import live predictor functions
             from live_crowd_predictor import LiveCrowdPredictor
             
             predictor = LiveCrowdPredictor()
             
-            # Analyze video frames
-            cap = cv2.VideoCapture(video_path)
-            
+            # Sample frames at ~1 FPS via grab()+retrieve(); skipped frames
+            # never get decoded, so ingestion cost scales with the sample
+            # rate instead of the source frame rate
             frame_analyses = []
             frame_count = 0
             
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+            prev_gray = None
+            for frame_count, frame in iter_sampled_frames(video_path, target_fps=1.0):
+                # Cheap native motion score first: when the scene barely
+                # changed since the last analyzed frame, reuse that
+                # analysis instead of paying another AI call
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                if prev_gray is not None and frame_analyses:
+                    active_cells, mean_motion = _frame_motion(gray, prev_gray)
+                    if active_cells == 0 and mean_motion < 2.0:
+                        frame_analyses.append(frame_analyses[-1])
+                        prev_gray = gray
+                        if len(frame_analyses) >= 10:
+                            break
+                        continue
+                prev_gray = gray
                 
-                frame_count += 1
+                analysis = predictor._analyze_frame_with_ai(frame)
+                frame_analyses.append(analysis)
                 
-                # Analyze every 30th frame to save time
-                if frame_count % 30 == 0:
-                    analysis = predictor._analyze_frame_with_ai(frame)
-                    frame_analyses.append(analysis)
+                yield {
+                    'frame_idx': frame_count,
+                    'analyses_performed': len(frame_analyses),
+                    'people_count': analysis.get('people_count', 0),
+                    'density_score': analysis.get('density_score', 0),
+                    'flow_direction': analysis.get('flow_direction', 'unknown')
+                }
                 
                 # Limit to 10 analyses for uploaded video
                 if len(frame_analyses) >= 10:
                     break
             
-            cap.release()
-            
             if not frame_analyses:
-                return {'error': 'Could not analyze video frames'}
+                yield {'final': True, 'result': {'error': 'Could not analyze video frames'}}
+                return
             
             # Aggregate results
             people_counts = [a.get('people_count', 0) for a in frame_analyses]
@@ -1102,7 +1447,7 @@ class CrowdPredictionUI:
             # Generate prediction based on analysis
             prediction = self._generate_video_prediction(avg_people, avg_density, venue_info)
             
-            return {
+            yield {'final': True, 'result': {
                 'people_count': int(avg_people),
                 'density_score': round(avg_density, 1),
                 'flow_direction': most_common_flow,
@@ -1111,11 +1456,19 @@ class CrowdPredictionUI:
                 'frame_count': frame_count,
                 'analyses_performed': len(frame_analyses),
                 'venue_context': venue_info
-            }
+            }}
             
         except Exception as e:
             print(f"Error analyzing uploaded video: {e}")
-            return {'error': str(e)}
+            yield {'final': True, 'result': {'error': str(e)}}
+
+    def _analyze_uploaded_video(self, video_path: str, location: Tuple[float, float], venue_info: Dict) -> Dict:
+        """Uploaded video ko analyze karta hai (drains the incremental iterator)"""
+        result = {'error': 'Could not analyze video frames'}
+        for partial in self._analyze_uploaded_video_iter(video_path, location, venue_info):
+            if partial.get('final'):
+                result = partial['result']
+        return result
 
     def _generate_video_prediction(self, avg_people: float, avg_density: float, venue_info: Dict) -> str:
         """Video analysis ke basis par prediction generate karta hai"""